@@ -12,8 +12,12 @@ import argparse, json, os, csv, hashlib
 from pathlib import Path
 
 def sha256_file(p: Path) -> str:
-    h = hashlib.sha256()
     with open(p, "rb") as f:
+        # py>=3.11: still a Python read loop, but readinto() one reused buffer
+        # (no per-chunk bytes objects); update() releases the GIL on large chunks
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
         for chunk in iter(lambda: f.read(1<<20), b""): h.update(chunk)
     return h.hexdigest()
 
@@ -52,9 +56,12 @@ def scan_dir(root: str, out_csv: str) -> int:
                     failures = 0
                     for pt in manifest.get("parts", []):
                         p = ep_dir / pt["path"]
-                        if not p.exists():
+                        # one stat answers both "exists" and "size"
+                        try:
+                            size = os.stat(p).st_size
+                        except (FileNotFoundError, NotADirectoryError):
                             failures += 1; note.append(f"missing:{pt['path']}"); continue
-                        if os.path.getsize(p) != int(pt["bytes"]):
+                        if size != int(pt["bytes"]):
                             failures += 1; note.append(f"size_mismatch:{pt['path']}")
                         elif sha256_file(p) != pt["sha256"]:
                             failures += 1; note.append(f"sha_mismatch:{pt['path']}")
@@ -63,20 +70,14 @@ def scan_dir(root: str, out_csv: str) -> int:
             except Exception as e:
                 note.append(f"commit_error:{type(e).__name__}")
 
-        rows.append({
-            "epoch": epoch,
-            "dir": str(ep_dir),
-            "has_commit": has_commit,
-            "has_manifest": has_manifest,
-            "parts_ok": parts_ok,
-            "group_ok": group_ok,
-            "note": ";".join(note)
-        })
+        rows.append((epoch, str(ep_dir), has_commit, has_manifest,
+                     parts_ok, group_ok, ";".join(note)))
 
     Path(out_csv).parent.mkdir(parents=True, exist_ok=True)
     with open(out_csv, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=["epoch","dir","has_commit","has_manifest","parts_ok","group_ok","note"])
-        w.writeheader(); w.writerows(rows)
+        w = csv.writer(f)
+        w.writerow(["epoch","dir","has_commit","has_manifest","parts_ok","group_ok","note"])
+        w.writerows(rows)
     print(f"[group_guard] wrote {out_csv} ({len(rows)})")
     return len(rows)
 
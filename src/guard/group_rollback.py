@@ -9,13 +9,17 @@ def pick_latest_ok(scan_csv: Path) -> Path | None:
     best_epoch = -1
     best_dir: Path | None = None
     with open(scan_csv, newline="") as f:
-        r = csv.DictReader(f)
+        r = csv.reader(f)
+        ci = {name: i for i, name in enumerate(next(r, []))}
+        OK, EP, DI = ci.get("group_ok"), ci.get("epoch"), ci.get("dir")
+        if OK is None or EP is None:
+            return None
         for row in r:
             try:
-                ok = int(row.get("group_ok", "0"))
-                ep = int(row.get("epoch", "-1"))
-                d  = row.get("dir", "")
-            except Exception:
+                ok = int(row[OK])
+                ep = int(row[EP])
+                d  = row[DI] if DI is not None else ""
+            except (IndexError, ValueError):
                 continue
             if ok == 1 and ep > best_epoch:
                 best_epoch = ep
@@ -13,7 +13,8 @@ Output CSV columns (new):
 
 from __future__ import annotations
 import argparse, csv, hashlib, json, os, re
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 import numpy as np
 
 
@@ -24,15 +25,34 @@ EXPECTED = {
     "b2": {"shape": (10,), "dtype": np.float64},
 }
 KEY_ORDER = ["W1", "b1", "W2", "b2"]
+EPOCH_RE = re.compile(r"epoch_(\d+)")
+HEADER = ["epoch","file","bytes","sha256","load_ok","nan_total","inf_total",
+          "shape_ok","expected_digest_present","digest_match","corrupted","note"]
 
 
 def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
     with open(path, "rb") as f:
+        # py>=3.11: still a Python read loop, but readinto() one reused buffer
+        # (no per-chunk bytes objects); update() releases the GIL on large chunks
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
         for chunk in iter(lambda: f.read(1 << 20), b""):
             h.update(chunk)
     return h.hexdigest()
 
+def nonfinite_counts(a: np.ndarray) -> Tuple[int, int]:
+    """(nan, inf) counts; a clean real float array costs a single isfinite pass."""
+    if not np.issubdtype(a.dtype, np.floating):
+        # complex etc.: an element can be both nan and inf, so count each separately
+        return int(np.isnan(a).sum()), int(np.isinf(a).sum())
+    fin = np.isfinite(a)
+    n_bad = a.size - int(np.count_nonzero(fin))
+    if n_bad == 0:
+        return 0, 0
+    n_nan = int(np.count_nonzero(np.isnan(a)))
+    return n_nan, n_bad - n_nan
+
 def array_digest(arr: np.ndarray) -> str:
     h = hashlib.sha256()
     h.update(arr.dtype.str.encode("utf-8"))
@@ -48,20 +68,30 @@ def content_digest(payload: Dict[str, np.ndarray], key_order: List[str]) -> str:
     return h.hexdigest()
 
 def parse_epoch_from_name(name: str) -> int:
-    m = re.search(r"epoch_(\d+)", name)
+    # ckpt_epoch_0003.<ext>: slice the digits out; the regex only sees odd names
+    _, sep, tail = name.partition("epoch_")
+    digits = tail.split(".", 1)[0]
+    if sep and digits.isdecimal():
+        return int(digits)
+    m = EPOCH_RE.search(name)
     return int(m.group(1)) if m else -1
 
 
 def scan_dir(ckpt_dir: str, out_csv: str) -> int:
     os.makedirs(os.path.dirname(out_csv), exist_ok=True)
-    rows: List[dict] = []
+    rows: List[tuple] = []
 
-    for fn in sorted(os.listdir(ckpt_dir)):
-        if not fn.endswith(".npz"):
-            continue
+    # one directory pass: DirEntry.stat() gives sizes, the name set answers sidecar lookups
+    with os.scandir(ckpt_dir) as it:
+        entries = {e.name: e for e in it}
+    names = [fn for fn in sorted(entries) if fn.endswith(".npz")]
+    # Hash all files up front; sha256 releases the GIL, so threads overlap
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+        file_shas = list(ex.map(sha256_file, [os.path.join(ckpt_dir, fn) for fn in names]))
+
+    for fn, file_sha in zip(names, file_shas):
         path = os.path.join(ckpt_dir, fn)
-        size = os.path.getsize(path)
-        file_sha = sha256_file(path)
+        size = entries[fn].stat().st_size
         sidecar = path + ".json"
 
         # Defaults
@@ -73,9 +103,10 @@ def scan_dir(ckpt_dir: str, out_csv: str) -> int:
         expected_digest = None
         expected_present = 0
 
-        if os.path.exists(sidecar):
+        if fn + ".json" in entries:
             try:
-                meta = json.loads(open(sidecar, "r", encoding="utf-8").read())
+                with open(sidecar, "rb") as f:
+                    meta = json.loads(f.read())
                 expected_digest = str(meta.get("expected_digest", "") or "")
                 if expected_digest:
                     expected_present = 1
@@ -88,8 +119,9 @@ def scan_dir(ckpt_dir: str, out_csv: str) -> int:
             with np.load(path, allow_pickle=False) as data:
                 for k in data.files:
                     arrays[k] = data[k]
-                    nan_total += int(np.isnan(arrays[k]).sum())
-                    inf_total += int(np.isinf(arrays[k]).sum())
+                    n_nan, n_inf = nonfinite_counts(arrays[k])
+                    nan_total += n_nan
+                    inf_total += n_inf
         except Exception as e:
             load_ok = 0
             note_parts.append(f"load_error:{type(e).__name__}")
@@ -127,26 +159,17 @@ def scan_dir(ckpt_dir: str, out_csv: str) -> int:
             (expected_present == 1 and digest_match == 0)
         )
 
-        rows.append({
-            "epoch": parse_epoch_from_name(fn),
-            "file": fn,
-            "bytes": size,
-            "sha256": file_sha,
-            "load_ok": load_ok,
-            "nan_total": nan_total,
-            "inf_total": inf_total,
-            "shape_ok": shape_ok,
-            "expected_digest_present": expected_present,
-            "digest_match": digest_match,
-            "corrupted": corrupted,
-            "note": ";".join(note_parts),
-        })
-
-    header = ["epoch","file","bytes","sha256","load_ok","nan_total","inf_total",
-              "shape_ok","expected_digest_present","digest_match","corrupted","note"]
+        # tuple in HEADER order
+        rows.append((
+            parse_epoch_from_name(fn), fn, size, file_sha,
+            load_ok, nan_total, inf_total, shape_ok,
+            expected_present, digest_match, corrupted,
+            ";".join(note_parts),
+        ))
+
     with open(out_csv, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=header)
-        w.writeheader()
+        w = csv.writer(f)
+        w.writerow(HEADER)
         w.writerows(rows)
 
     print(f"[guard] wrote {out_csv} ({len(rows)} rows)")
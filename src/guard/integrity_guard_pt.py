@@ -14,7 +14,8 @@ Output CSV:
 """
 from __future__ import annotations
 import argparse, csv, hashlib, json, os, re
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 import torch
 import numpy as np
 
@@ -25,13 +26,36 @@ EXPECTED = {
     "fc2.bias":   (10,),
 }
 KEY_ORDER = ["fc1.weight","fc1.bias","fc2.weight","fc2.bias"]
+EPOCH_RE = re.compile(r"epoch_(\d+)")
+HEADER = [
+    "epoch","file","bytes","sha256","load_ok","nan_total","inf_total",
+    "shape_ok","expected_digest_present","digest_match",
+    "expected_file_sha_present","file_sha_match",   # NEW
+    "corrupted","note"
+]
 
 def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
     with open(path, "rb") as f:
+        # py>=3.11: still a Python read loop, but readinto() one reused buffer
+        # (no per-chunk bytes objects); update() releases the GIL on large chunks
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
         for chunk in iter(lambda: f.read(1 << 20), b""): h.update(chunk)
     return h.hexdigest()
 
+def nonfinite_counts(a: np.ndarray) -> Tuple[int, int]:
+    """(nan, inf) counts; a clean real float array costs a single isfinite pass."""
+    if not np.issubdtype(a.dtype, np.floating):
+        # complex etc.: an element can be both nan and inf, so count each separately
+        return int(np.isnan(a).sum()), int(np.isinf(a).sum())
+    fin = np.isfinite(a)
+    n_bad = a.size - int(np.count_nonzero(fin))
+    if n_bad == 0:
+        return 0, 0
+    n_nan = int(np.count_nonzero(np.isnan(a)))
+    return n_nan, n_bad - n_nan
+
 def tensor_digest(t: torch.Tensor) -> str:
     a = t.detach().cpu().contiguous().numpy()
     h = hashlib.sha256()
@@ -47,19 +71,29 @@ def content_digest(state: Dict[str, torch.Tensor], key_order: List[str]) -> str:
     return h.hexdigest()
 
 def parse_epoch_from_name(name: str) -> int:
-    m = re.search(r"epoch_(\d+)", name)
+    # ckpt_epoch_0003.<ext>: slice the digits out; the regex only sees odd names
+    _, sep, tail = name.partition("epoch_")
+    digits = tail.split(".", 1)[0]
+    if sep and digits.isdecimal():
+        return int(digits)
+    m = EPOCH_RE.search(name)
     return int(m.group(1)) if m else -1
 
 def scan_dir(ckpt_dir: str, out_csv: str) -> int:
     os.makedirs(os.path.dirname(out_csv), exist_ok=True)
-    rows: List[dict] = []
+    rows: List[tuple] = []
 
-    for fn in sorted(os.listdir(ckpt_dir)):
-        if not (fn.endswith(".pt") or fn.endswith(".pth")):
-            continue
+    # one directory pass: DirEntry.stat() gives sizes, the name set answers sidecar lookups
+    with os.scandir(ckpt_dir) as it:
+        entries = {e.name: e for e in it}
+    names = [fn for fn in sorted(entries) if fn.endswith(".pt") or fn.endswith(".pth")]
+    # Hash all files up front; sha256 releases the GIL, so threads overlap
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+        file_shas = list(ex.map(sha256_file, [os.path.join(ckpt_dir, fn) for fn in names]))
+
+    for fn, file_sha in zip(names, file_shas):
         path = os.path.join(ckpt_dir, fn)
-        size = os.path.getsize(path)
-        file_sha = sha256_file(path)
+        size = entries[fn].stat().st_size
         sidecar = path + ".json"
 
         load_ok, nan_total, inf_total = 1, 0, 0
@@ -72,9 +106,10 @@ def scan_dir(ckpt_dir: str, out_csv: str) -> int:
         expected_file_sha_present = 0
 
         # load sidecar (if exists)
-        if os.path.exists(sidecar):
+        if fn + ".json" in entries:
             try:
-                meta = json.loads(open(sidecar, "r", encoding="utf-8").read())
+                with open(sidecar, "rb") as f:
+                    meta = json.loads(f.read())
                 expected_digest = str(meta.get("expected_digest", "") or "")
                 expected_file_sha = str(meta.get("expected_file_sha256", "") or "")
                 if expected_digest: expected_digest_present = 1
@@ -90,8 +125,9 @@ def scan_dir(ckpt_dir: str, out_csv: str) -> int:
                 if isinstance(v, torch.Tensor):
                     arrays[k] = v
                     a = v.detach().cpu().numpy()
-                    nan_total += int(np.isnan(a).sum())
-                    inf_total += int(np.isinf(a).sum())
+                    n_nan, n_inf = nonfinite_counts(a)
+                    nan_total += n_nan
+                    inf_total += n_inf
         except Exception as e:
             load_ok = 0
             note_parts.append(f"load_error:{type(e).__name__}")
@@ -133,31 +169,17 @@ def scan_dir(ckpt_dir: str, out_csv: str) -> int:
             (expected_file_sha_present == 1 and file_sha_match == 0)   # NEW
         )
 
-        rows.append({
-            "epoch": parse_epoch_from_name(fn),
-            "file": fn,
-            "bytes": size,
-            "sha256": file_sha,
-            "load_ok": load_ok,
-            "nan_total": nan_total,
-            "inf_total": inf_total,
-            "shape_ok": shape_ok,
-            "expected_digest_present": expected_digest_present,
-            "digest_match": digest_match,
-            "expected_file_sha_present": expected_file_sha_present,  # NEW
-            "file_sha_match": file_sha_match,                        # NEW
-            "corrupted": corrupted,
-            "note": ";".join(note_parts),
-        })
-
-    header = [
-        "epoch","file","bytes","sha256","load_ok","nan_total","inf_total",
-        "shape_ok","expected_digest_present","digest_match",
-        "expected_file_sha_present","file_sha_match",   # NEW
-        "corrupted","note"
-    ]
+        # tuple in HEADER order
+        rows.append((
+            parse_epoch_from_name(fn), fn, size, file_sha,
+            load_ok, nan_total, inf_total, shape_ok,
+            expected_digest_present, digest_match,
+            expected_file_sha_present, file_sha_match,   # NEW
+            corrupted, ";".join(note_parts),
+        ))
+
     with open(out_csv, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=header); w.writeheader(); w.writerows(rows)
+        w = csv.writer(f); w.writerow(HEADER); w.writerows(rows)
 
     print(f"[guard] wrote {out_csv} ({len(rows)} rows)")
     return len(rows)
@@ -22,23 +22,25 @@ def main():
     ap.add_argument("--out-link", required=True)
     args = ap.parse_args()
 
-    rows=[]
+    # plain csv.reader rows; columns located once from the header
+    best_epoch, best_file = -1, None
     with open(args.scan_csv, newline="") as f:
-        r=csv.DictReader(f)
-        for row in r:
-            try:
-                row["epoch"]=int(row.get("epoch","-1"))
-                row["corrupted"]=int(row.get("corrupted","1"))
-            except Exception:
-                continue
-            rows.append(row)
-
-    ok = [r for r in rows if r["corrupted"]==0 and r["epoch"]>=0 and r.get("file")]
-    if not ok:
+        r=csv.reader(f)
+        ci={name: i for i, name in enumerate(next(r, []))}
+        EP, CO, FI = ci.get("epoch"), ci.get("corrupted"), ci.get("file")
+        if EP is not None and CO is not None and FI is not None:
+            for row in r:
+                try:
+                    ep=int(row[EP]); bad=int(row[CO]); fn=row[FI]
+                except (IndexError, ValueError):
+                    continue
+                if bad==0 and fn and ep>best_epoch:
+                    best_epoch, best_file = ep, fn
+
+    if best_file is None:
         raise SystemExit("No non-corrupted checkpoints found")
 
-    best = max(ok, key=lambda r: r["epoch"])
-    ckpt_path = Path(args.ckpt_root) / best["file"]
+    ckpt_path = Path(args.ckpt_root) / best_file
     if not ckpt_path.exists():
         raise SystemExit(f"Checkpoint not found on disk: {ckpt_path}")
 
@@ -94,14 +94,16 @@ def spawn_iostat(log_path: str, interval_sec: int = 1) -> ProcHandle:
         try:
             for line in pop.stdout:
                 s = line.rstrip("\r\n")
+                # dispatch on the first non-space char; data lines skip both regexes
+                first = s.lstrip()[:1]
 
                 # filter repeating headers
-                if hdr_cols.match(s):
+                if first == "K" and hdr_cols.match(s):
                     if not seen_cols:
                         f.write(line)
                         seen_cols = True
                     continue
-                if hdr_disks.match(s):
+                if first == "d" and hdr_disks.match(s):
                     if not seen_disks:
                         f.write(line)
                         seen_disks = True
@@ -8,6 +8,7 @@ from __future__ import annotations
 import argparse, sys, subprocess, time, re
 from pathlib import Path
 from typing import List, Tuple
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -93,13 +94,11 @@ def main():
     # CDF of per-ckpt latency
     plt.figure(figsize=(7, 4))
     for tag, g in df.groupby("mode"):
-        vals = sorted(g["per_ckpt_s"].tolist())
-        y = [i/len(vals) for i in range(1, len(vals)+1)]
+        vals = np.sort(g["per_ckpt_s"].to_numpy())
+        y = np.arange(1, len(vals)+1) / len(vals)
         plt.plot(vals, y, label=tag)
-        # print quick quantiles for convenience
-        q50 = g["per_ckpt_s"].quantile(0.50)
-        q90 = g["per_ckpt_s"].quantile(0.90)
-        q99 = g["per_ckpt_s"].quantile(0.99)
+        # print quick quantiles for convenience (one call on the sorted array; linear, as pandas)
+        q50, q90, q99 = np.quantile(vals, [0.50, 0.90, 0.99])
         print(f"[bench] {tag}: p50={q50:.4f}s p90={q90:.4f}s p99={q99:.4f}s (n={len(g)})")
     plt.xlabel("Per-checkpoint latency (s)")
     plt.ylabel("CDF")
@@ -10,39 +10,44 @@ Examples:
   python tools/run_many_torch.py --seeds 0-9 --epochs 60 --every 3 --modes none
   python tools/run_many_torch.py --seeds 0-9 --epochs 60 --every 3 --modes none,bitflip,truncate,zerorange
   python tools/run_many_torch.py --seeds 0-9 --epochs 60 --every 3 --modes none --write-mode unsafe --crash early,mid,late
+  python tools/run_many_torch.py --seeds 0-99 --modes none,bitflip --emit-commands jobs.sh && parallel -j 16 < jobs.sh
 """
 from __future__ import annotations
-import argparse, subprocess, sys
+import argparse, shlex, subprocess, sys
 from pathlib import Path
 import pandas as pd
 
 def parse_range(s: str) -> list[int]:
-    parts=[]
+    # single pass, first occurrence wins: duplicates dropped, user order kept
+    seen=set(); parts=[]
     for tok in s.split(","):
         tok=tok.strip()
         if not tok: continue
         if "-" in tok:
             a,b=tok.split("-",1); a=int(a); b=int(b)
             lo,hi=min(a,b),max(a,b)
-            parts.extend(range(lo,hi+1))
+            vals=range(lo,hi+1)
         else:
-            parts.append(int(tok))
-    return sorted(set(parts))
+            vals=(int(tok),)
+        for v in vals:
+            if v not in seen:
+                seen.add(v); parts.append(v)
+    return parts
 
 def ckpt_epochs(epochs: int, every: int) -> list[int]:
     return list(range(every, epochs+1, every))
 
-def choose_crash_epoch(epochs: int, every: int, when: str) -> int:
-    cks = ckpt_epochs(epochs, every)
-    if not cks: return -1
-    if when=="early": return cks[0]
-    if when=="mid":   return cks[len(cks)//2]
-    if when=="late":  return cks[-1]
-    return -1
+def run_logged(cmd: list[str], log_path: Path | None, check: bool) -> None:
+    """Run cmd with stdout/stderr sent to log_path (or discarded if None)."""
+    if log_path is None:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=check)
+        return
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "wb") as lf:
+        subprocess.run(cmd, stdout=lf, stderr=subprocess.STDOUT, check=check)
 
-def run_writer(py, out_dir: Path, epochs: int, every: int,
-               seed: int, mode: str, write_mode: str, crash_epoch: int) -> None:
-    out_dir.mkdir(parents=True, exist_ok=True)
+def writer_cmd(py, out_dir: Path, epochs: int, every: int,
+               seed: int, mode: str, write_mode: str, crash_epoch: int) -> list[str]:
     cmd = [
         py, "-m", "src.aiwork.torch_ckpt_writer",
         "--epochs", str(epochs), "--checkpoint-every", str(every),
@@ -52,16 +57,26 @@ def run_writer(py, out_dir: Path, epochs: int, every: int,
         "--write-mode", write_mode,
     ]
     if crash_epoch > 0: cmd += ["--crash-epoch", str(crash_epoch)]
+    return cmd
+
+def guard_cmd(py, ckpt_dir: Path, out_csv: Path) -> list[str]:
+    return [py, "-m", "src.guard.integrity_guard_pt",
+            "--ckpt-dir", str(ckpt_dir), "--out", str(out_csv)]
+
+def run_writer(py, out_dir: Path, epochs: int, every: int,
+               seed: int, mode: str, write_mode: str, crash_epoch: int,
+               quiet: bool = False) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cmd = writer_cmd(py, out_dir, epochs, every, seed, mode, write_mode, crash_epoch)
     print("[run]", " ".join(cmd))
-    # allow crash exit code
-    subprocess.run(cmd, check=False)
+    # allow crash exit code; child output goes to a per-run log
+    run_logged(cmd, None if quiet else out_dir / "writer.log", check=False)
 
-def run_guard(py, ckpt_dir: Path, out_csv: Path) -> None:
+def run_guard(py, ckpt_dir: Path, out_csv: Path, quiet: bool = False) -> None:
     out_csv.parent.mkdir(parents=True, exist_ok=True)
-    cmd = [py, "-m", "src.guard.integrity_guard_pt",
-           "--ckpt-dir", str(ckpt_dir), "--out", str(out_csv)]
+    cmd = guard_cmd(py, ckpt_dir, out_csv)
     print("[scan]", " ".join(cmd))
-    subprocess.run(cmd, check=True)
+    run_logged(cmd, None if quiet else ckpt_dir / "guard.log", check=True)
 
 def aggregate_csv(per_run_csvs: list[Path], out_all: Path) -> None:
     frames=[]
@@ -103,25 +118,53 @@ def main():
     ap.add_argument("--root", default="trace/ckpts_runs_torch")
     ap.add_argument("--scan-root", default="trace/guard/runs_torch")
     ap.add_argument("--agg-out", default="trace/guard/ckpt_scan_torch_all.csv")
+    ap.add_argument("--quiet", action="store_true",
+                    help="discard child output instead of writing writer.log/guard.log per run")
+    ap.add_argument("--emit-commands", default=None, metavar="FILE",
+                    help="write one shell line per run (writer ; guard) to FILE instead of "
+                         "running them, e.g. for 'parallel -j N < FILE'; skips aggregation")
     args = ap.parse_args()
 
     seeds = parse_range(args.seeds)
     modes = [m.strip() for m in args.modes.split(",") if m.strip()]
     crash_modes = [c.strip() for c in args.crash.split(",") if c.strip()] or ["none"]
 
+    # crash timing -> checkpoint epoch, computed once for the whole sweep
+    cks = ckpt_epochs(args.epochs, args.every)
+    crash_epoch_map = {
+        "early": cks[0] if cks else -1,
+        "mid":   cks[len(cks)//2] if cks else -1,
+        "late":  cks[-1] if cks else -1,
+        "none":  -1,
+    }
+
     py = sys.executable
     per_run_csvs: list[Path] = []
+    jobs: list[str] = []
 
     for mode in modes:
         for crash in crash_modes:
             for seed in seeds:
-                crash_epoch = choose_crash_epoch(args.epochs, args.every, crash) if crash!="none" else -1
+                crash_epoch = crash_epoch_map.get(crash, -1)
                 run_dir = Path(args.root) / f"{mode}__{args.write_mode}__{crash}" / f"seed_{seed}"
-                run_writer(py, run_dir, args.epochs, args.every, seed, mode, args.write_mode, crash_epoch)
                 scan_csv = Path(args.scan_root) / f"{mode}__{args.write_mode}__{crash}" / f"seed_{seed}.csv"
-                run_guard(py, run_dir, scan_csv)
+                if args.emit_commands:
+                    # the writer exits 1 on a simulated crash, so chain with ';' rather than '&&'
+                    jobs.append(shlex.join(writer_cmd(py, run_dir, args.epochs, args.every, seed, mode,
+                                                      args.write_mode, crash_epoch))
+                                + " ; " + shlex.join(guard_cmd(py, run_dir, scan_csv)))
+                    continue
+                run_writer(py, run_dir, args.epochs, args.every, seed, mode, args.write_mode, crash_epoch, args.quiet)
+                run_guard(py, run_dir, scan_csv, args.quiet)
                 per_run_csvs.append(scan_csv)
 
+    if args.emit_commands:
+        out = Path(args.emit_commands)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text("".join(j + "\n" for j in jobs), encoding="utf-8")
+        print(f"[emit] wrote {out} ({len(jobs)} jobs)")
+        return
+
     aggregate_csv(per_run_csvs, Path(args.agg_out))
 
 if __name__ == "__main__":
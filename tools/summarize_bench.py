@@ -3,8 +3,8 @@
 from __future__ import annotations
 import argparse
 from pathlib import Path
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
 def main():
     ap = argparse.ArgumentParser()
@@ -13,6 +13,7 @@ def main():
     ap.add_argument("--out-overhead", default="figures/bench_overhead.csv")
     ap.add_argument("--out-md", default="figures/bench_summary.md")
     ap.add_argument("--out-png", default="figures/bench_bars.png")
+    ap.add_argument("--no-png", action="store_true", help="tables only; skip the chart (and matplotlib)")
     args = ap.parse_args()
 
     df = pd.read_csv(args.in_csv)
@@ -21,13 +22,17 @@ def main():
 
     # Quantiles per mode
     qs = (0.50, 0.90, 0.99)
-    rows = []
-    for mode, g in df.groupby("mode"):
-        r = {"mode": mode, "n": len(g)}
-        for q in qs:
-            r[f"p{int(q*100)}"] = g["per_ckpt_s"].quantile(q)
-        rows.append(r)
-    summ = pd.DataFrame(rows).sort_values("mode")
+    # group once: stable sort by mode code, slice bounds via searchsorted
+    modes, inv = np.unique(df["mode"].astype(str).to_numpy(), return_inverse=True)
+    order = np.argsort(inv, kind="stable")
+    vals = df["per_ckpt_s"].to_numpy(dtype=float)[order]
+    starts = np.searchsorted(inv[order], np.arange(len(modes)))
+    ends = np.r_[starts[1:], len(vals)]
+    # linear interpolation, same as Series.quantile
+    qv = np.stack([np.quantile(vals[s:e], qs) for s, e in zip(starts, ends)])
+    summ = pd.DataFrame({"mode": modes, "n": ends - starts})
+    for j, q in enumerate(qs):
+        summ[f"p{int(q*100)}"] = qv[:, j]
     Path(args.out_summary).parent.mkdir(parents=True, exist_ok=True)
     summ.to_csv(args.out_summary, index=False)
 
@@ -35,17 +40,11 @@ def main():
     if "unsafe" not in set(summ["mode"]):
         raise SystemExit("No 'unsafe' mode in bench; cannot compute overhead.")
     base = summ.set_index("mode").loc["unsafe"]
-    ov_rows = []
-    for _, r in summ.iterrows():
-        if r["mode"] == "unsafe":
-            continue
-        ov_rows.append({
-            "mode": r["mode"],
-            "p50_overhead_pct": (r["p50"] - base["p50"]) / base["p50"] * 100.0,
-            "p90_overhead_pct": (r["p90"] - base["p90"]) / base["p90"] * 100.0,
-            "p99_overhead_pct": (r["p99"] - base["p99"]) / base["p99"] * 100.0,
-        })
-    over = pd.DataFrame(ov_rows).sort_values("mode")
+    rest = summ[summ["mode"] != "unsafe"]
+    over = pd.DataFrame({"mode": rest["mode"].to_numpy()})
+    for p in ("p50", "p90", "p99"):
+        over[f"{p}_overhead_pct"] = (rest[p].to_numpy() - base[p]) / base[p] * 100.0
+    over = over.sort_values("mode")
     over.to_csv(args.out_overhead, index=False)
 
     # Markdown table (for report)
@@ -53,20 +52,26 @@ def main():
         "| mode | n | p50(s) | p90(s) | p99(s) |",
         "|:-----|--:|------:|------:|------:|",
     ]
-    for _, r in summ.iterrows():
-        lines.append(f"| {r['mode']} | {int(r['n'])} | {r['p50']:.6f} | {r['p90']:.6f} | {r['p99']:.6f} |")
+    lines += [f"| {r.mode} | {int(r.n)} | {r.p50:.6f} | {r.p90:.6f} | {r.p99:.6f} |"
+              for r in summ.itertuples(index=False)]
     # Overhead section
     lines.append("\n**Overhead vs unsafe (%)**")
     lines.append("| mode | p50(%) | p90(%) | p99(%) |")
     lines.append("|:-----|------:|------:|------:|")
-    for _, r in over.iterrows():
-        lines.append(f"| {r['mode']} | {r['p50_overhead_pct']:.1f} | {r['p90_overhead_pct']:.1f} | {r['p99_overhead_pct']:.1f} |")
+    lines += [f"| {r.mode} | {r.p50_overhead_pct:.1f} | {r.p90_overhead_pct:.1f} | {r.p99_overhead_pct:.1f} |"
+              for r in over.itertuples(index=False)]
     Path(args.out_md).write_text("\n".join(lines), encoding="utf-8")
+    if args.no_png:
+        print(f"[bench] wrote {args.out_summary}, {args.out_overhead}, {args.out_md}")
+        return
 
     # Bar chart: p50/p90/p99 grouped by mode
+    # matplotlib is only loaded when a chart is drawn (see --no-png)
+    import matplotlib
+    matplotlib.use("Agg")  # file output only
+    import matplotlib.pyplot as plt
     modes = list(summ["mode"])
     width = 0.25
-    import numpy as np
     x = np.arange(len(modes))
     plt.figure(figsize=(8,4))
     plt.bar(x - width, summ["p50"], width, label="p50")
@@ -1,23 +1,53 @@
 #!/usr/bin/env python3
 # Summarize group-atomicity scans into a table and figures.
-# Input : trace/guard/group_scan_all.csv  (from tools.run_group_fuzz)
+# Input : trace/guard/group_scan_all.csv  (from tools.run_group_fuzz; .parquet also accepted)
 # Output: figures/group_summary.csv, figures/group_summary.md,
 #         figures/group_bars.png, figures/group_reasons.png
 from __future__ import annotations
-import argparse, math, re
+import argparse, re
 from pathlib import Path
 from typing import Tuple
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-
-def wilson_ci(k:int, n:int, z:float=1.959963984540054) -> Tuple[float,float]:
-    if n==0: return (0.0,0.0)
-    p=k/n; denom=1+(z*z)/n
-    center=(p+(z*z)/(2*n))/denom
-    radius=(z*math.sqrt((p*(1-p)/n)+(z*z)/(4*n*n)))/denom
-    lo=max(0.0, center-radius); hi=min(1.0, center+radius)
+try:
+    from tools.tableio import read_table
+except ModuleNotFoundError as e:
+    if e.name != "tools":
+        raise
+    from tableio import read_table  # run as a script: python tools/<name>.py
+
+def wilson_ci_vec(k, n, z:float=1.959963984540054) -> Tuple[np.ndarray,np.ndarray]:
+    # elementwise over arrays k, n; n==0 -> (0,0)
+    k=np.asarray(k, dtype=float); n=np.asarray(n, dtype=float)
+    z2=z*z
+    lo=np.zeros_like(n); hi=np.zeros_like(n)
+    # saturated groups, closed form (no sqrt): k==0 -> (0, z^2/(n+z^2)); k==n -> (n/(n+z^2), 1)
+    zero=(n>0)&(k==0); full=(n>0)&(k==n)
+    hi[zero]=z2/(n[zero]+z2)
+    lo[full]=n[full]/(n[full]+z2); hi[full]=1.0
+    mid=(n>0)&~zero&~full
+    km,nm=k[mid],n[mid]
+    p=km/nm; denom=1+z2/nm
+    center=(p+z2/(2*nm))/denom
+    radius=(z*np.sqrt((p*(1-p)/nm)+z2/(4*nm*nm)))/denom
+    lo[mid]=np.maximum(0.0, center-radius)
+    hi[mid]=np.minimum(1.0, center+radius)
     return (lo,hi)
 
+# Group guard note reasons, one named group each
+REASON_RE = re.compile(r"(?P<no_commit>\bno_commit\b)"
+                       r"|(?P<commit_manifest_mismatch>\bcommit_manifest_mismatch\b)"
+                       r"|(?P<manifest_error>\bmanifest_error)"
+                       r"|(?P<missing_part>\bmissing:)"
+                       r"|(?P<size_mismatch>\bsize_mismatch:)"
+                       r"|(?P<sha_mismatch>\bsha_mismatch:)")
+
+def note_flags(note: pd.Series, pat: re.Pattern = REASON_RE) -> pd.DataFrame:
+    # a note may carry several reasons: extractall + any() per row
+    m=note.fillna("").str.extractall(pat)
+    flags=m.notna().groupby(level=0).any()
+    return flags.reindex(note.index, fill_value=False).astype(int)
+
 def parse_args():
     ap = argparse.ArgumentParser()
     ap.add_argument("--in", dest="inp", default="trace/guard/group_scan_all.csv")
@@ -25,25 +55,32 @@ def parse_args():
     ap.add_argument("--out-md", default="figures/group_summary.md")
     ap.add_argument("--out-png", default="figures/group_bars.png")
     ap.add_argument("--out-reasons", default="figures/group_reasons.png")
+    ap.add_argument("--no-png", action="store_true", help="tables only; skip both charts (and matplotlib)")
     return ap.parse_args()
 
 def main():
     args=parse_args()
-    df = pd.read_csv(args.inp)
+    df = read_table(args.inp)
 
     # Normalize columns
     for col in ["write_mode","crash_at","note"]:
         if col not in df.columns: df[col]="unknown"
     df["group_ok"] = df["group_ok"].astype(int)
 
-    # --- Table aggregation ---
+    # Parse note field for primary reasons (one pass for all of them)
+    reasons=list(REASON_RE.groupindex)
+    flags=note_flags(df["note"])
+    for r in reasons:
+        df[r]=flags[r]
+
+    # --- Aggregation: one groupby feeds both the table and the reason chart ---
     g = df.groupby(["write_mode","crash_at"], as_index=False).agg(
         total=("group_ok","size"),
-        ok=("group_ok","sum")
+        ok=("group_ok","sum"),
+        **{r:(r,"sum") for r in reasons}
     )
     g["rate"]=g["ok"]/g["total"]
-    cis = g.apply(lambda r: wilson_ci(int(r["ok"]), int(r["total"])), axis=1)
-    g["ci_low"]=[c[0] for c in cis]; g["ci_high"]=[c[1] for c in cis]
+    g["ci_low"], g["ci_high"] = wilson_ci_vec(g["ok"].to_numpy(), g["total"].to_numpy())
     g["key"]=g["write_mode"]+"|"+g["crash_at"]
 
     # order for nicer plotting
@@ -54,21 +91,25 @@ def main():
     g=g.sort_values(["order","write_mode","crash_at"]).reset_index(drop=True)
 
     Path(args.out_csv).parent.mkdir(parents=True, exist_ok=True)
-    g.to_csv(args.out_csv, index=False)
+    g.drop(columns=reasons).to_csv(args.out_csv, index=False)
 
     # Markdown table for report
     md=["| write | crash | total | group_ok | rate | 95% CI |",
         "|:------|:------|-----:|--------:|-----:|:-----:|"]
-    for _,r in g.iterrows():
-        md.append(f"| {r['write_mode']} | {r['crash_at']} | {int(r['total'])} | {int(r['ok'])} | {r['rate']:.3f} | [{r['ci_low']:.3f}, {r['ci_high']:.3f}] |")
+    md+=[f"| {r.write_mode} | {r.crash_at} | {int(r.total)} | {int(r.ok)} | {r.rate:.3f} | [{r.ci_low:.3f}, {r.ci_high:.3f}] |"
+         for r in g.itertuples(index=False)]
     Path(args.out_md).write_text("\n".join(md), encoding="utf-8")
     print(f"[table] wrote {args.out_csv} and {args.out_md}")
+    if args.no_png:
+        return
 
     # --- Bar chart with 95% CI ---
-    x=list(g["key"]); y=list(g["rate"])
-    yerr_low=[max(0.0,m-lo) for m,lo in zip(y,g["ci_low"])]
-    yerr_high=[max(0.0,hi-m) for m,hi in zip(y,g["ci_high"])]
-    yerr=[yerr_low,yerr_high]
+    # matplotlib is only loaded when a chart is drawn (see --no-png)
+    import matplotlib
+    matplotlib.use("Agg")  # file output only
+    import matplotlib.pyplot as plt
+    x=list(g["key"]); y=g["rate"].to_numpy(dtype=float)
+    yerr=np.clip(np.vstack([y-g["ci_low"].to_numpy(), g["ci_high"].to_numpy()-y]), 0.0, None)
 
     plt.figure(figsize=(10,4))
     plt.bar(range(len(x)), y, yerr=yerr, capsize=3)
@@ -80,40 +121,15 @@ def main():
     print(f"[figure] wrote {args.out_png}")
 
     # --- Reason breakdown (stacked bars) ---
-    # Parse note field for primary reasons
-    def has(pat: str) -> pd.Series:
-        return df["note"].fillna("").str.contains(pat, regex=True)
-    df["no_commit"] = has(r"\bno_commit\b").astype(int)
-    df["commit_manifest_mismatch"] = has(r"\bcommit_manifest_mismatch\b").astype(int)
-    df["manifest_error"] = has(r"\bmanifest_error").astype(int)
-    df["missing_part"] = has(r"\bmissing:").astype(int)
-    df["size_mismatch"] = has(r"\bsize_mismatch:").astype(int)
-    df["sha_mismatch"] = has(r"\bsha_mismatch:").astype(int)
-
-    g2 = df.groupby(["write_mode","crash_at"], as_index=False).agg(
-        total=("group_ok","size"),
-        no_commit=("no_commit","sum"),
-        commit_manifest_mismatch=("commit_manifest_mismatch","sum"),
-        manifest_error=("manifest_error","sum"),
-        missing_part=("missing_part","sum"),
-        size_mismatch=("size_mismatch","sum"),
-        sha_mismatch=("sha_mismatch","sum"),
-    )
-    g2["key"]=g2["write_mode"]+"|"+g2["crash_at"]
-    g2=g2.sort_values("key")
+    g2=g.sort_values("key")
 
     # stacked bars
-    reasons=["no_commit","commit_manifest_mismatch","manifest_error","missing_part","size_mismatch","sha_mismatch"]
     plt.figure(figsize=(10,4))
-    bottom=None
-    for r in reasons:
-        vals=list(g2[r])
-        if bottom is None:
-            plt.bar(g2["key"], vals, label=r)
-            bottom=vals
-        else:
-            plt.bar(g2["key"], vals, bottom=bottom, label=r)
-            bottom=[a+b for a,b in zip(bottom, vals)]
+    # every layer's bottom at once: exclusive prefix sum across reasons
+    arr=g2[reasons].to_numpy(dtype=np.int64)
+    bottoms=np.cumsum(arr, axis=1)-arr
+    for i,r in enumerate(reasons):
+        plt.bar(g2["key"], arr[:,i], bottom=bottoms[:,i], label=r)
     plt.xticks(rotation=25, ha="right")
     plt.ylabel("Count")
     plt.title("Failure reason breakdown (by write|crash)")
@@ -6,71 +6,96 @@
 #     figures/torch_mode_summary.md
 #     figures/torch_mode_bars.png
 from __future__ import annotations
-import argparse, math, re
+import argparse, re
 from pathlib import Path
 from typing import Dict, List, Tuple
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+try:
+    from tools.tableio import read_table
+except ModuleNotFoundError as e:
+    if e.name != "tools":
+        raise
+    from tableio import read_table  # run as a script: python tools/<name>.py
 
-def wilson_ci(k: int, n: int, z: float = 1.959963984540054) -> Tuple[float, float]:
-    """Wilson score 95% CI for binomial proportion."""
-    if n == 0:
-        return (0.0, 0.0)
-    p = k / n
-    denom = 1.0 + (z*z)/n
-    center = (p + (z*z)/(2*n)) / denom
-    radius = (z * math.sqrt((p*(1-p)/n) + (z*z)/(4*n*n))) / denom
-    lo, hi = max(0.0, center - radius), min(1.0, center + radius)
+def wilson_ci_vec(k, n, z: float = 1.959963984540054) -> Tuple[np.ndarray, np.ndarray]:
+    """Wilson score 95% CI for binomial proportions, elementwise over arrays k, n."""
+    k = np.asarray(k, dtype=float)
+    n = np.asarray(n, dtype=float)
+    z2 = z*z
+    lo = np.zeros_like(n)  # n == 0 -> (0, 0)
+    hi = np.zeros_like(n)
+    # saturated groups have closed-form bounds, no sqrt:
+    #   k == 0 -> (0, z^2/(n+z^2)),  k == n -> (n/(n+z^2), 1)
+    zero = (n > 0) & (k == 0)
+    full = (n > 0) & (k == n)
+    hi[zero] = z2 / (n[zero] + z2)
+    lo[full] = n[full] / (n[full] + z2)
+    hi[full] = 1.0
+    mid = (n > 0) & ~zero & ~full
+    km, nm = k[mid], n[mid]
+    p = km / nm
+    denom = 1.0 + z2/nm
+    center = (p + z2/(2*nm)) / denom
+    radius = (z * np.sqrt((p*(1-p)/nm) + z2/(4*nm*nm))) / denom
+    lo[mid] = np.maximum(0.0, center - radius)
+    hi[mid] = np.minimum(1.0, center + radius)
     return (lo, hi)
 
+# Guard note reasons, one named group each
+NOTE_RE = re.compile(r"(?P<load_error>\bload_error\b)"
+                     r"|(?P<digest_mismatch>\bdigest_mismatch\b)"
+                     r"|(?P<file_sha_mismatch>\bfile_sha_mismatch\b)")
+
+def note_flags(note: pd.Series, pat: re.Pattern = NOTE_RE) -> pd.DataFrame:
+    """0/1 column per named group of pat, from a single pass over note."""
+    # a note may carry several reasons: extractall + any() per row
+    m = note.fillna("").str.extractall(pat)
+    flags = m.notna().groupby(level=0).any()
+    return flags.reindex(note.index, fill_value=False).astype(int)
+
+# Only the columns the per-file reduction needs; fixed dtypes skip per-file inference
+SCAN_USECOLS = ["corrupted", "note"]
+SCAN_DTYPES = {"corrupted": "int32", "note": str}
+
 def scan_runs(root: str = "trace/guard/runs_torch") -> pd.DataFrame:
-    rows: List[pd.DataFrame] = []
-    for csv_path in sorted(Path(root).glob("*/*.csv")):
-        # parse <mode>__<write>__<crash>/seed_X.csv
-        parts = csv_path.as_posix().split("/")
-        triplet = parts[-2]  # "<mode>__<write_mode>__<crash>"
+    """One row of partial counts per seed CSV; rows are reduced as each file is read."""
+    partials: List[Dict[str, object]] = []
+    run_dirs = sorted(d for d in Path(root).iterdir() if d.is_dir()) if Path(root).is_dir() else []
+    for run_dir in run_dirs:
+        # <mode>__<write>__<crash>/seed_X.csv: the triplet is shared by the whole directory
         try:
-            mode, write_mode, crash = triplet.split("__")
+            mode, write_mode, crash = run_dir.name.split("__")
         except ValueError:
             # fallback: unknown naming
             mode, write_mode, crash = "unknown", "unknown", "unknown"
-        seed = re.sub(r"^seed_", "", Path(parts[-1]).stem)
+        for csv_path in sorted(run_dir.glob("*.csv")):
+            stem = csv_path.stem
+            seed = stem[5:] if stem.startswith("seed_") else stem
 
-        df = pd.read_csv(csv_path)
-        df["mode"] = mode
-        df["write_mode"] = write_mode
-        df["crash"] = crash
-        df["seed"] = seed
-        df["key"] = df["mode"] + "|" + df["write_mode"] + "|" + df["crash"]
-        rows.append(df)
-    if not rows:
+            df = read_table(csv_path, usecols=SCAN_USECOLS, dtype=SCAN_DTYPES,
+                            keep_default_na=False)
+            if df.empty:
+                continue
+            flags = note_flags(df["note"]).sum()
+            part: Dict[str, object] = {
+                "mode": mode, "write_mode": write_mode, "crash": crash, "seed": seed,
+                "total": len(df), "corrupted": int((df["corrupted"] > 0).sum()),
+            }
+            for r in NOTE_RE.groupindex:
+                part[r] = int(flags[r])
+            partials.append(part)
+    if not partials:
         raise SystemExit(f"No CSV files under {root}")
-    return pd.concat(rows, ignore_index=True)
-
-def summarize(df: pd.DataFrame) -> pd.DataFrame:
-    # Robust note parsing (may be empty)
-    def has_note(s: pd.Series, pat: str) -> pd.Series:
-        return s.fillna("").str.contains(pat, regex=True)
-
-    df["is_corrupted"] = (df["corrupted"] > 0).astype(int)
-    df["n_load_error"]      = has_note(df["note"], r"\bload_error\b").astype(int)
-    df["n_digest_mismatch"] = has_note(df["note"], r"\bdigest_mismatch\b").astype(int)
-    df["n_file_sha_mismatch"] = has_note(df["note"], r"\bfile_sha_mismatch\b").astype(int)
+    return pd.DataFrame(partials)
 
-    grp = df.groupby(["mode", "write_mode", "crash"], as_index=False)
-    # Basic counts
-    agg = grp.agg(
-        total=("is_corrupted", "size"),
-        corrupted=("is_corrupted", "sum"),
-        load_error=("n_load_error", "sum"),
-        digest_mismatch=("n_digest_mismatch", "sum"),
-        file_sha_mismatch=("n_file_sha_mismatch", "sum"),
-    )
+def summarize(part: pd.DataFrame) -> pd.DataFrame:
+    # Sum per-file partials into per-(mode, write, crash) counts
+    cols = ["total", "corrupted", *NOTE_RE.groupindex]
+    agg = part.groupby(["mode", "write_mode", "crash"], as_index=False)[cols].sum()
     # Rates + 95% CI
     agg["rate"] = agg["corrupted"] / agg["total"]
-    cis = agg.apply(lambda r: wilson_ci(int(r["corrupted"]), int(r["total"])), axis=1)
-    agg["ci_low"] = [c[0] for c in cis]
-    agg["ci_high"] = [c[1] for c in cis]
+    agg["ci_low"], agg["ci_high"] = wilson_ci_vec(agg["corrupted"].to_numpy(), agg["total"].to_numpy())
 
     # Nice key + ordering
     agg["key"] = agg["mode"] + "|" + agg["write_mode"] + "|" + agg["crash"]
@@ -95,19 +120,22 @@ def write_table(agg: pd.DataFrame, out_csv="figures/torch_mode_summary.csv", out
     # Markdown table for report
     md = ["| mode | write | crash | total | corrupted | rate | 95% CI | load_error | digest_mismatch | file_sha_mismatch |",
           "|:-----|:------|:------|-----:|---------:|-----:|:------:|----------:|----------------:|------------------:|"]
-    for _, r in sel.iterrows():
-        ci = f"[{r['ci_low']:.3f}, {r['ci_high']:.3f}]"
-        md.append(f"| {r['mode']} | {r['write_mode']} | {r['crash']} | {int(r['total'])} | {int(r['corrupted'])} | {r['rate']:.3f} | {ci} | {int(r['load_error'])} | {int(r['digest_mismatch'])} | {int(r['file_sha_mismatch'])} |")
+    md += [f"| {r.mode} | {r.write_mode} | {r.crash} | {int(r.total)} | {int(r.corrupted)} | {r.rate:.3f} | "
+           f"[{r.ci_low:.3f}, {r.ci_high:.3f}] | {int(r.load_error)} | {int(r.digest_mismatch)} | {int(r.file_sha_mismatch)} |"
+           for r in sel.itertuples(index=False)]
     Path(out_md).write_text("\n".join(md), encoding="utf-8")
     print(f"[table] wrote {out_csv} and {out_md}")
 
 def plot_bars(agg: pd.DataFrame, out_png="figures/torch_mode_bars.png") -> None:
+    # matplotlib is only loaded when a chart is drawn (see --no-png)
+    import matplotlib
+    matplotlib.use("Agg")  # file output only
+    import matplotlib.pyplot as plt
     # One bar per key (mode|write|crash), with 95% CI as error bar
     x = list(agg["key"])
-    y = list(agg["rate"])
-    yerr_low = [max(0.0, m - lo) for m, lo in zip(y, agg["ci_low"])]
-    yerr_high = [max(0.0, hi - m) for m, hi in zip(y, agg["ci_high"])]
-    yerr = [yerr_low, yerr_high]
+    y = agg["rate"].to_numpy(dtype=float)
+    # (2, N) asymmetric error bars, clipped at 0
+    yerr = np.clip(np.vstack([y - agg["ci_low"].to_numpy(), agg["ci_high"].to_numpy() - y]), 0.0, None)
 
     plt.figure(figsize=(11, 4))
     plt.bar(range(len(x)), y, yerr=yerr, capsize=3)
@@ -125,12 +153,14 @@ def main():
     ap.add_argument("--out-csv", default="figures/torch_mode_summary.csv")
     ap.add_argument("--out-md", default="figures/torch_mode_summary.md")
     ap.add_argument("--out-png", default="figures/torch_mode_bars.png")
+    ap.add_argument("--no-png", action="store_true", help="tables only; skip the chart (and matplotlib)")
     args = ap.parse_args()
 
     df = scan_runs(args.runs_root)
     agg = summarize(df)
     write_table(agg, args.out_csv, args.out_md)
-    plot_bars(agg, args.out_png)
+    if not args.no_png:
+        plot_bars(agg, args.out_png)
 
 if __name__ == "__main__":
     main()
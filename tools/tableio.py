@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# Table loading shared by the summarize scripts.
+# - read_table(path): CSV (or .parquet) -> DataFrame
+# - With pyarrow installed, a zstd Parquet sibling is written on first read and
+#   reused while it is strictly newer than the CSV. The sibling is keyed by the
+#   read options (dtype, csv kwargs): <stem>.parquet for a plain read,
+#   <stem>.<key>.parquet otherwise, so callers parsing differently don't share it.
+#   The cache is best effort: it is written to a temp file and renamed into place,
+#   an unreadable cache is dropped, and a missing CSV is an error even if a
+#   cache exists. Only an explicit .parquet path is read as Parquet.
+#   Without pyarrow this is a plain pd.read_csv.
+from __future__ import annotations
+import hashlib, os
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+# what a bad cache read/write raises; Arrow errors subclass these
+# (ArrowInvalid, ArrowTypeError, ArrowNotImplementedError for a missing codec)
+CACHE_ERRORS = (OSError, ValueError, TypeError, NotImplementedError)
+
+def parquet_path(path: Path, dtype: Optional[Dict[str, object]] = None, **csv_kw) -> Path:
+    if not dtype and not csv_kw:
+        return path.with_suffix(".parquet")
+    opts = repr((sorted((dtype or {}).items()), sorted(csv_kw.items())))
+    key = hashlib.sha1(opts.encode("utf-8")).hexdigest()[:10]
+    return path.with_suffix(f".{key}.parquet")
+
+def drop_cache(pq: Path) -> None:
+    try:
+        pq.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+def read_table(path, usecols: Optional[List[str]] = None,
+               dtype: Optional[Dict[str, object]] = None, **csv_kw) -> pd.DataFrame:
+    p = Path(path)
+    if p.suffix == ".parquet":
+        return pd.read_parquet(p, engine="pyarrow", columns=usecols)
+    if not HAVE_ARROW:
+        return pd.read_csv(p, usecols=usecols, dtype=dtype, **csv_kw)
+
+    csv_mtime = p.stat().st_mtime_ns  # a missing CSV fails here, cache or not
+    pq = parquet_path(p, dtype, **csv_kw)
+    # strictly newer (ns): a CSV rewritten in the same coarse mtime tick is re-read
+    if pq.exists() and pq.stat().st_mtime_ns > csv_mtime:
+        try:
+            return pd.read_parquet(pq, engine="pyarrow", columns=usecols)
+        except CACHE_ERRORS as e:
+            print(f"[tableio] dropping unreadable cache {pq}: {type(e).__name__}: {e}")
+            drop_cache(pq)
+
+    # cache holds the full table so later callers may ask for other columns
+    df = pd.read_csv(p, dtype=dtype, **csv_kw)
+    # write a temp sibling and rename it into place: an interrupted write never
+    # leaves a truncated file under the cache name
+    tmp = pq.with_name(f".{pq.name}.{os.getpid()}.tmp")
+    try:
+        df.to_parquet(tmp, engine="pyarrow", index=False,
+                      compression="zstd", compression_level=3)
+        os.replace(tmp, pq)
+    except CACHE_ERRORS as e:
+        print(f"[tableio] parquet cache skipped for {p}: {type(e).__name__}: {e}")
+        drop_cache(tmp)
+    return df[usecols] if usecols is not None else df